@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+
+from reportgen.calendario import clasificar_dias, TIPO_SEMANA
+from reportgen.cumplimiento import claves_cruce_turnos
+
+
+def construir_matriz_asistencia(tabla: pd.DataFrame, fecha_inicio=None, fecha_fin=None) -> dict:
+    """
+    Construye una sola vez la matriz empleado × fecha a partir de la tabla de jornadas.
+    Devuelve dict con:
+      'presencia': np.ndarray bool (empleados × días), True si el empleado marcó ese día;
+      'empleados': DataFrame con Nombre, Departamento (e ID si existe) en el orden de las filas;
+      'fechas': DatetimeIndex diario en el orden de las columnas.
+    Se llena por posición (códigos de empleado y de día), sin pivotear ni recorrer filas.
+    """
+    fechas_tabla = pd.to_datetime(tabla['Fecha']).dt.normalize()
+    inicio = pd.Timestamp(fecha_inicio).normalize() if fecha_inicio is not None else fechas_tabla.min()
+    fin = pd.Timestamp(fecha_fin).normalize() if fecha_fin is not None else fechas_tabla.max()
+    fechas = pd.date_range(inicio, fin, freq='D')
+
+    codigos, nombres = pd.factorize(tabla['Nombre'], sort=True)
+    primeros = tabla.groupby('Nombre').first().reindex(nombres)
+    empleados = pd.DataFrame({'Nombre': nombres})
+    empleados['Departamento'] = (
+        primeros['Departamento'].to_numpy() if 'Departamento' in tabla.columns else 'No especificado'
+    )
+    if 'ID' in tabla.columns:
+        empleados['ID'] = primeros['ID'].to_numpy()
+
+    dia = ((fechas_tabla - inicio) // pd.Timedelta(days=1)).to_numpy()
+    dentro = (dia >= 0) & (dia < len(fechas))
+    presencia = np.zeros((len(nombres), len(fechas)), dtype=bool)
+    presencia[codigos[dentro], dia[dentro]] = True
+
+    return {'presencia': presencia, 'empleados': empleados, 'fechas': fechas}
+
+
+def dias_esperados(matriz: dict, feriados=None, turnos: pd.DataFrame = None) -> np.ndarray:
+    """
+    Devuelve la matriz bool de días en que cada empleado debía trabajar.
+    Con turnos (salida de cumplimiento.cargar_turnos) se usa el rol de cada empleado;
+    si no, se esperan todos los días hábiles del calendario (sin fines de semana ni feriados),
+    contados desde el primer hasta el último marcaje de cada empleado para no marcar como
+    ausencias los días anteriores a un ingreso o posteriores a un retiro.
+    """
+    presencia = matriz['presencia']
+    fechas = matriz['fechas']
+
+    if turnos is not None:
+        esperado = np.zeros_like(presencia)
+        empleados = matriz['empleados']
+        claves, claves_turno = claves_cruce_turnos(empleados, turnos)
+
+        # Un merge (y no get_indexer) tolera claves repetidas: el turno cuenta para cada coincidencia
+        cruce = pd.DataFrame({
+            'Clave': claves_turno.to_numpy(),
+            'Dia': ((turnos['Fecha'] - fechas[0]) // pd.Timedelta(days=1)).to_numpy(),
+        }).dropna().merge(
+            pd.DataFrame({'Clave': claves.to_numpy(), 'Fila': np.arange(len(empleados))}).dropna(),
+            on='Clave'
+        )
+        fila, dia = cruce['Fila'].to_numpy(), cruce['Dia'].to_numpy().astype(int)
+        valido = (dia >= 0) & (dia < len(fechas))
+        esperado[fila[valido], dia[valido]] = True
+        return esperado
+
+    habil = (clasificar_dias(fechas, feriados) == TIPO_SEMANA).to_numpy()
+    columnas = np.arange(len(fechas))
+    tiene_marcajes = presencia.any(axis=1)
+    primero = presencia.argmax(axis=1)
+    ultimo = len(fechas) - 1 - presencia[:, ::-1].argmax(axis=1)
+    activo = (columnas >= primero[:, None]) & (columnas <= ultimo[:, None]) & tiene_marcajes[:, None]
+    return activo & habil
+
+
+def _rachas_maximas(matriz_bool: np.ndarray) -> tuple:
+    """
+    Largo e inicio de la racha más larga de True en cada fila, por diferencias sobre la
+    matriz completa (sin bucles por empleado).
+    """
+    n = matriz_bool.shape[0]
+    bordes = np.diff(np.pad(matriz_bool.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+    filas, inicios = np.nonzero(bordes == 1)
+    _, fines = np.nonzero(bordes == -1)
+    largos = fines - inicios
+
+    maximo = np.zeros(n, dtype=int)
+    np.maximum.at(maximo, filas, largos)
+    inicio_maximo = np.full(n, -1)
+    es_maxima = largos == maximo[filas]
+    # Si hay empate se conserva la primera racha de la fila (filas viene ordenado)
+    filas_max, primera = np.unique(filas[es_maxima], return_index=True)
+    inicio_maximo[filas_max] = inicios[es_maxima][primera]
+    return maximo, inicio_maximo
+
+
+def resumen_asistencia(matriz: dict, esperado: np.ndarray) -> list:
+    """
+    Resumen por empleado: días esperados, presentes, ausencias (esperado sin marcaje),
+    racha más larga de días consecutivos trabajados y racha más larga de ausencias.
+    Devuelve lista de dicts ordenada por ausencias (descendente).
+    """
+    presencia = matriz['presencia']
+    fechas = matriz['fechas']
+    ausente = esperado & ~presencia
+
+    racha_trabajo, inicio_trabajo = _rachas_maximas(presencia)
+    racha_ausencia, _ = _rachas_maximas(ausente)
+
+    resumen = matriz['empleados'].copy()
+    resumen['Dias_esperados'] = esperado.sum(axis=1)
+    resumen['Dias_presentes'] = presencia.sum(axis=1)
+    resumen['Ausencias'] = ausente.sum(axis=1)
+    resumen['Racha_trabajo'] = racha_trabajo
+    resumen['Inicio_racha_trabajo'] = [fechas[i] if i >= 0 else pd.NaT for i in inicio_trabajo]
+    resumen['Racha_ausencia'] = racha_ausencia
+    return resumen.sort_values(['Ausencias', 'Nombre'], ascending=[False, True]).to_dict('records')
+
+
+def ausencias_por_persona_y_mes(matriz: dict, esperado: np.ndarray) -> dict:
+    """
+    Fechas sin marcaje en días esperados, con la misma forma que los outliers:
+    {Nombre: {Mes: [fechas]}}
+    """
+    filas, dias = np.nonzero(esperado & ~matriz['presencia'])
+    nombres = matriz['empleados']['Nombre'].tolist()
+    # Etiquetas por columna calculadas una vez; np.nonzero ya entrega fila y fecha ordenadas
+    fechas = list(matriz['fechas'])
+    meses = list(matriz['fechas'].strftime('%B %Y'))
+
+    resultado = {}
+    for fila, dia in zip(filas.tolist(), dias.tolist()):
+        resultado.setdefault(nombres[fila], {}).setdefault(meses[dia], []).append(fechas[dia])
+    return resultado
+
+
+def cobertura_por_departamento(matriz: dict, feriados=None) -> list:
+    """
+    Personal presente por departamento y día, resumido por mes sobre los días hábiles:
+    plantilla, promedio de presentes, mínimo y la fecha en que ocurrió el mínimo.
+    """
+    fechas = matriz['fechas']
+    presentes = pd.DataFrame(matriz['presencia'], columns=fechas).groupby(
+        matriz['empleados']['Departamento'].to_numpy()
+    ).sum()
+    plantilla = matriz['empleados'].groupby('Departamento').size()
+
+    habil = (clasificar_dias(fechas, feriados) == TIPO_SEMANA).to_numpy()
+    presentes = presentes.loc[:, habil]
+    if presentes.empty:
+        return []
+
+    largo = presentes.stack().rename('Presentes').reset_index()
+    largo.columns = ['Departamento', 'Fecha', 'Presentes']
+    largo['Periodo'] = largo['Fecha'].dt.to_period('M')
+    minimos = largo.loc[largo.groupby(['Departamento', 'Periodo'])['Presentes'].idxmin()]
+
+    resumen = largo.groupby(['Departamento', 'Periodo']).agg(
+        Promedio=('Presentes', 'mean'),
+        Minimo=('Presentes', 'min')
+    ).reset_index()
+    resumen['Fecha_minimo'] = minimos['Fecha'].to_numpy()
+    resumen['Plantilla'] = resumen['Departamento'].map(plantilla)
+    resumen['Mes'] = resumen['Periodo'].dt.strftime('%B %Y')
+    return resumen.drop(columns='Periodo').to_dict('records')
@@ -0,0 +1,99 @@
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+TIPO_SEMANA = 'Día de semana'
+TIPO_FIN_DE_SEMANA = 'Fin de semana'
+TIPO_FERIADO = 'Feriado'
+
+# Feriados nacionales de fecha fija (mes, día)
+FERIADOS_FIJOS = [
+    (1, 1),    # Año Nuevo
+    (4, 14),   # Día de las Américas
+    (5, 1),    # Día del Trabajo
+    (9, 15),   # Día de la Independencia
+    (12, 25),  # Navidad
+]
+
+
+def _domingo_de_pascua(anio: int) -> date:
+    """
+    Calcula el Domingo de Resurrección (algoritmo gregoriano anónimo).
+    """
+    a = anio % 19
+    b, c = divmod(anio, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(anio, mes, dia + 1)
+
+
+def feriados_nacionales(anios) -> list:
+    """
+    Devuelve los feriados nacionales de fecha fija más Jueves y Viernes Santo para cada año.
+    La Semana Morazánica cambia por decreto cada año: debe agregarse con cargar_calendario.
+    """
+    feriados = []
+    for anio in sorted(set(anios)):
+        feriados.extend(date(anio, mes, dia) for mes, dia in FERIADOS_FIJOS)
+        pascua = _domingo_de_pascua(anio)
+        feriados.extend([pascua - timedelta(days=3), pascua - timedelta(days=2)])
+    return feriados
+
+
+def cargar_calendario(*fuentes, anios=None, incluir_nacionales: bool = True) -> np.ndarray:
+    """
+    Reúne los días no laborables en un arreglo ordenado de datetime64[D].
+    Cada fuente puede ser una lista de fechas o un archivo (.csv, .xlsx, .xls o .txt) con una
+    columna 'Fecha' (en .txt, una fecha por línea), p. ej. los días propios del hospital.
+    Si se indican anios (y incluir_nacionales es True) se agregan sus feriados nacionales;
+    no hace falta para clasificar_dias, que siempre agrega los de los años de los datos.
+    """
+    fechas = []
+    for fuente in fuentes:
+        if isinstance(fuente, (str, os.PathLike)):
+            extension = os.path.splitext(fuente)[1].lower()
+            if extension == '.csv':
+                fechas.extend(pd.read_csv(fuente)['Fecha'])
+            elif extension in ['.xlsx', '.xls']:
+                fechas.extend(pd.read_excel(fuente, engine='openpyxl')['Fecha'])
+            elif extension == '.txt':
+                with open(fuente, encoding='utf-8') as f:
+                    fechas.extend(linea.strip() for linea in f if linea.strip())
+            else:
+                raise ValueError("Tipo de archivo no permitido para calendario. Solo .csv, .xlsx, .xls o .txt")
+        else:
+            fechas.extend(fuente)
+
+    convertidas = pd.to_datetime(pd.Series(fechas, dtype='object'), errors='coerce').dropna()
+    if incluir_nacionales and anios is not None:
+        convertidas = pd.concat([convertidas, pd.to_datetime(pd.Series(feriados_nacionales(anios)))])
+    return np.unique(convertidas.values.astype('datetime64[D]'))
+
+
+def clasificar_dias(fechas, feriados=None, incluir_nacionales: bool = True) -> pd.Series:
+    """
+    Clasifica cada fecha como 'Día de semana', 'Fin de semana' o 'Feriado' con aritmética
+    de días hábiles de numpy (sin recorrer filas). Un feriado que cae en fin de semana
+    se reporta como feriado. feriados agrega días propios (p. ej. de cargar_calendario) a los
+    feriados nacionales de los años presentes en fechas, salvo que incluir_nacionales sea False.
+    """
+    fechas = pd.Series(fechas)
+    convertidas = pd.to_datetime(fechas)
+    dias = convertidas.values.astype('datetime64[D]')
+    feriados = np.asarray(feriados if feriados is not None else [], dtype='datetime64[D]')
+    if incluir_nacionales:
+        nacionales = feriados_nacionales(convertidas.dropna().dt.year.unique())
+        feriados = np.concatenate([feriados, np.asarray(nacionales, dtype='datetime64[D]')])
+
+    es_feriado = np.isin(dias, feriados)
+    es_habil = np.is_busday(dias)
+    tipo = np.where(es_feriado, TIPO_FERIADO, np.where(es_habil, TIPO_SEMANA, TIPO_FIN_DE_SEMANA))
+    return pd.Series(tipo, index=fechas.index)
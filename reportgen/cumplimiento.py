@@ -0,0 +1,172 @@
+import os
+import pandas as pd
+
+
+def normalizar_clave(serie: pd.Series) -> pd.Series:
+    """
+    Lleva IDs de empleado a texto comparable: 101, 101.0 y '101' quedan como '101'.
+    """
+    numerica = pd.to_numeric(serie, errors='coerce')
+    if numerica.notna().sum() == serie.notna().sum():
+        return numerica.astype('Int64').astype(str)
+    return serie.astype(str).str.strip()
+
+
+def claves_cruce_turnos(empleados: pd.DataFrame, turnos: pd.DataFrame) -> tuple:
+    """
+    Elige cómo cruzar empleados (jornadas o la matriz de asistencia) con el rol de turnos y
+    devuelve (claves_empleados, claves_turnos). Se usa el ID, salvo que haya IDs vacíos o
+    compartidos por más de un Nombre y el rol traiga Nombre: entonces se cruza por Nombre.
+    Los IDs vacíos quedan como NaN para que no coincidan entre sí.
+    """
+    usar_id = 'ID' in empleados.columns and 'ID' in turnos.columns
+    if usar_id and 'Nombre' in turnos.columns:
+        ids = normalizar_clave(empleados['ID'])
+        por_nombre = pd.DataFrame({'ID': ids, 'Nombre': empleados['Nombre']}).drop_duplicates()
+        usar_id = empleados['ID'].notna().all() and por_nombre['ID'].is_unique
+    if usar_id:
+        return (normalizar_clave(empleados['ID']).where(empleados['ID'].notna()),
+                normalizar_clave(turnos['ID']).where(turnos['ID'].notna()))
+    return empleados['Nombre'], turnos['Nombre']
+
+
+def _combinar_fecha_hora(fecha: pd.Series, hora: pd.Series) -> pd.Series:
+    """
+    Devuelve Fecha + hora. Acepta horas como texto ('07:00'), datetime.time o datetime completo.
+    """
+    if pd.api.types.is_datetime64_any_dtype(hora):
+        # Las horas sueltas de Excel llegan con una fecha base (1899/1900)
+        completa = hora.dt.year > 1900
+        return hora.where(completa, fecha + (hora - hora.dt.normalize()))
+    # '07:00' → '07:00:00' para que to_timedelta lo interprete
+    texto = hora.astype(str).str.strip().str.replace(r'^(\d{1,2}:\d{2})$', r'\1:00', regex=True)
+    return fecha + pd.to_timedelta(texto, errors='coerce')
+
+
+def cargar_turnos(origen) -> pd.DataFrame:
+    """
+    Carga el rol de turnos desde un DataFrame o un archivo (.csv, .xlsx, .xls).
+    Debe traer 'ID' o 'Nombre', 'Fecha', 'Inicio' y 'Fin' (hora o fecha/hora planificada).
+    Devuelve un DataFrame con Inicio_plan y Fin_plan como datetime; los turnos nocturnos
+    cuyo fin es anterior al inicio terminan al día siguiente.
+    """
+    if isinstance(origen, pd.DataFrame):
+        turnos = origen.copy()
+    else:
+        extension = os.path.splitext(origen)[1].lower()
+        if extension == '.csv':
+            turnos = pd.read_csv(origen)
+        elif extension in ['.xlsx', '.xls']:
+            turnos = pd.read_excel(origen, engine='openpyxl')
+        else:
+            raise ValueError("Tipo de archivo no permitido para turnos. Solo .csv, .xlsx o .xls")
+
+    turnos.rename(columns={"Nro. de usuario": "ID"}, inplace=True)
+    faltantes = {'Fecha', 'Inicio', 'Fin'} - set(turnos.columns)
+    if faltantes or not {'ID', 'Nombre'} & set(turnos.columns):
+        raise ValueError(f"El rol de turnos debe incluir ID o Nombre, Fecha, Inicio y Fin. Faltan: {sorted(faltantes)}")
+
+    turnos['Fecha'] = pd.to_datetime(turnos['Fecha'], errors='coerce').dt.normalize()
+    turnos = turnos[turnos['Fecha'].notna()].copy()
+    turnos['Inicio_plan'] = _combinar_fecha_hora(turnos['Fecha'], turnos['Inicio'])
+    turnos['Fin_plan'] = _combinar_fecha_hora(turnos['Fecha'], turnos['Fin'])
+    nocturno = turnos['Fin_plan'] <= turnos['Inicio_plan']
+    turnos.loc[nocturno, 'Fin_plan'] += pd.Timedelta(days=1)
+    if 'Nombre' in turnos.columns:
+        turnos['Nombre'] = turnos['Nombre'].str.title()
+
+    return turnos.dropna(subset=['Inicio_plan', 'Fin_plan']).reset_index(drop=True)
+
+
+def calcular_cumplimiento(tabla: pd.DataFrame, turnos: pd.DataFrame,
+                          tolerancia_minutos: float = 5, ventana_horas: float = 12) -> pd.DataFrame:
+    """
+    Asocia cada jornada de transform_df con el turno planificado del mismo empleado (ver
+    claves_cruce_turnos) y la misma fecha (en turnos nocturnos, la fecha en que empieza),
+    el de inicio más cercano a la Entrada dentro de ventana_horas. Cada turno se asigna a una
+    sola jornada (la más cercana) y solo si la Entrada no es posterior a su Fin_plan.
+    Agrega las columnas:
+    Inicio_plan, Fin_plan, Retraso_min, Salida_anticipada_min, Horas_extra,
+    Tarde (retraso mayor a tolerancia_minutos) y Sin_turno.
+    Retraso, salida anticipada y horas extra solo se calculan en jornadas completas.
+    """
+    claves, claves_turno = claves_cruce_turnos(tabla, turnos)
+
+    izquierda = tabla.copy()
+    izquierda['_clave'] = claves
+    izquierda['_fecha'] = pd.to_datetime(izquierda['Fecha']).dt.normalize()
+    izquierda = izquierda.sort_values('Entrada', kind='mergesort')
+
+    # merge_asof exige la misma resolución (ns/us) en ambas llaves
+    derecha = turnos[['Inicio_plan', 'Fin_plan']].astype(izquierda['Entrada'].dtype)
+    derecha['_clave'] = claves_turno
+    derecha['_fecha'] = turnos['Fecha'].astype(izquierda['_fecha'].dtype)
+    derecha['_turno'] = range(len(derecha))
+    derecha = derecha[derecha['_clave'].notna()].sort_values('Inicio_plan', kind='mergesort')
+
+    cruce = pd.merge_asof(
+        izquierda, derecha,
+        left_on='Entrada', right_on='Inicio_plan', by=['_clave', '_fecha'],
+        direction='nearest', tolerance=pd.Timedelta(hours=ventana_horas)
+    )
+
+    # Descartar emparejamientos que no corresponden: entrada después del fin del turno,
+    # o un turno ya asignado a otra jornada más cercana a su inicio
+    distancia = (cruce['Entrada'] - cruce['Inicio_plan']).abs()
+    invalido = cruce['Entrada'] > cruce['Fin_plan']
+    repetido = (
+        cruce.assign(_distancia=distancia)[~invalido & cruce['_turno'].notna()]
+             .sort_values('_distancia', kind='mergesort')
+             .duplicated('_turno')
+    )
+    descartar = invalido | repetido.reindex(cruce.index, fill_value=False)
+    cruce.loc[descartar, ['Inicio_plan', 'Fin_plan']] = pd.NaT
+    cruce = cruce.drop(columns=['_clave', '_fecha', '_turno'])
+
+    minutos = pd.Timedelta(minutes=1)
+    completo = cruce['Estado'] == 'Completo'
+    duracion_plan = cruce['Fin_plan'] - cruce['Inicio_plan']
+
+    cruce['Sin_turno'] = cruce['Inicio_plan'].isna()
+    cruce['Retraso_min'] = ((cruce['Entrada'] - cruce['Inicio_plan']) / minutos).clip(lower=0).where(completo)
+    cruce['Salida_anticipada_min'] = ((cruce['Fin_plan'] - cruce['Salida']) / minutos).clip(lower=0).where(completo)
+    cruce['Horas_extra'] = ((cruce['Jornada'] - duracion_plan) / pd.Timedelta(hours=1)).clip(lower=0).where(completo)
+    cruce['Tarde'] = cruce['Retraso_min'] > tolerancia_minutos
+
+    return cruce.sort_values(['Nombre', 'Entrada']).reset_index(drop=True)
+
+
+def resumen_cumplimiento_mensual(cumplimiento: pd.DataFrame) -> dict:
+    """
+    Totaliza el cumplimiento por empleado y mes (en orden cronológico).
+    Devuelve dict: Nombre → lista de dicts con claves Mes, Dias_tarde, Minutos_tarde,
+    Salidas_anticipadas, Minutos_anticipados, Horas_extra, Dias_sin_turno.
+    Los empleados que no figuran en el rol de turnos se omiten.
+    """
+    if cumplimiento is None or cumplimiento.empty:
+        return {}
+
+    en_rol = ~cumplimiento.groupby('Nombre')['Sin_turno'].transform('all')
+    df = cumplimiento[en_rol].copy()
+    df['Periodo'] = pd.to_datetime(df['Fecha']).dt.to_period('M')
+    df['Minutos_tarde'] = df['Retraso_min'].where(df['Tarde'], 0)
+    df['Salida_anticipada'] = df['Salida_anticipada_min'] > 0
+
+    resumen = (
+        df.groupby(['Nombre', 'Periodo'])
+          .agg(
+            Dias_tarde=('Tarde', 'sum'),
+            Minutos_tarde=('Minutos_tarde', 'sum'),
+            Salidas_anticipadas=('Salida_anticipada', 'sum'),
+            Minutos_anticipados=('Salida_anticipada_min', 'sum'),
+            Horas_extra=('Horas_extra', 'sum'),
+            Dias_sin_turno=('Sin_turno', 'sum')
+          )
+          .reset_index()
+    )
+    resumen['Mes'] = resumen['Periodo'].dt.strftime('%B %Y')
+
+    return {
+        nombre: grp.drop(columns=['Nombre', 'Periodo']).to_dict('records')
+        for nombre, grp in resumen.groupby('Nombre')
+    }
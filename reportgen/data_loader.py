@@ -1,11 +1,28 @@
 import tabula
 import xlrd
+import openpyxl
 import pandas as pd
+import io
 import os
 from reportgen.processing import compute_resumen_mensual 
+from reportgen.limpieza import limpiar_marcajes, imprimir_resumen_limpieza
+from reportgen.calendario import clasificar_dias
+from reportgen.filtros import construir_filtro, fila_cumple_filtro, filtrar_marcajes, filtros_parquet
 
-def cargar_historial():
+# Firmas de los formatos admitidos, para reconocer buffers sin nombre de archivo
+FIRMAS_ARCHIVO = {
+    b'%PDF': '.pdf',
+    b'PK\x03\x04': '.xlsx',
+    b'\xd0\xcf\x11\xe0': '.xls',
+    b'PAR1': '.parquet',
+}
 
+def cargar_historial(en_memoria: bool = False):
+    """
+    Solicita el archivo de marcajes y devuelve su nombre. En Colab, con en_memoria=True devuelve
+    directamente un io.BytesIO sobre los bytes subidos (con atributo name), listo para
+    procesar_archivo sin volver a abrir el archivo desde el disco.
+    """
     try:
         from google.colab import files
         print("Ejecutando en Google Colab.")
@@ -21,10 +38,15 @@ def cargar_historial():
         extension = os.path.splitext(filename)[1].lower()
 
         # Validar extensión del archivo
-        if extension not in ['.xlsx', '.xls', '.pdf']:
-            raise ValueError("Tipo de archivo no permitido. Solo se permiten archivos .xlsx, .xls o .pdf")
+        if extension not in ['.xlsx', '.xls', '.pdf', '.parquet']:
+            raise ValueError("Tipo de archivo no permitido. Solo se permiten archivos .xlsx, .xls, .pdf o .parquet")
 
         print(f"Archivo '{filename}' cargado correctamente.")
+        if en_memoria:
+            # BytesIO sobre bytes inmutables comparte el buffer hasta que alguien escriba en él
+            buffer = io.BytesIO(uploaded[filename])
+            buffer.name = filename
+            return buffer
         return filename
     except ImportError:
         print("Ejecutando localmente.")
@@ -42,64 +64,168 @@ def cargar_historial():
         extension = os.path.splitext(filename)[1].lower()
 
         # Validar extensión del archivo
-        if extension not in ['.xlsx', '.xls', '.pdf']:
-            raise ValueError("Tipo de archivo no permitido. Solo se permiten archivos .xlsx, .xls o .pdf")
+        if extension not in ['.xlsx', '.xls', '.pdf', '.parquet']:
+            raise ValueError("Tipo de archivo no permitido. Solo se permiten archivos .xlsx, .xls, .pdf o .parquet")
 
         print(f"Usando archivo local: '{filename}'.")
         return filename
 
 
 
-def procesar_archivo(filename):
+def abrir_origen(origen, nombre: str = None) -> tuple:
+    """
+    Normaliza el origen de los marcajes: una ruta, bytes (p. ej. los de files.upload() en Colab)
+    o un objeto tipo archivo. Devuelve (fuente, extension), donde fuente es la ruta o un objeto
+    tipo archivo legible por los lectores. La extensión sale de nombre, del atributo name del
+    objeto o, si no hay ninguno, de la firma de los primeros bytes.
+    """
+    if isinstance(origen, (str, os.PathLike)):
+        return origen, os.path.splitext(str(origen))[1].lower()
+
+    if isinstance(origen, (bytes, bytearray, memoryview)):
+        origen = io.BytesIO(origen)
+
+    nombre = nombre or getattr(origen, 'name', None)
+    if isinstance(nombre, str) and os.path.splitext(nombre)[1]:
+        return origen, os.path.splitext(nombre)[1].lower()
+
+    posicion = origen.tell()
+    cabecera = origen.read(4)
+    origen.seek(posicion)
+    for firma, extension in FIRMAS_ARCHIVO.items():
+        if cabecera.startswith(firma):
+            return origen, extension
+    raise ValueError("No se pudo determinar el tipo de archivo; indique el nombre con su extensión.")
+
+
+def procesar_archivo(filename, ventana_duplicados: float = 60, fecha_inicio=None, fecha_fin=None,
+                     departamentos=None, empleados=None, feriados=None, nombre: str = None,
+                     devolver_descartados: bool = False):
+    """
+    Lee el archivo de marcajes, lo depura con limpiar_marcajes y devuelve la tabla de jornadas.
+    filename puede ser una ruta, bytes o un objeto tipo archivo (ver abrir_origen); nombre
+    indica la extensión cuando el buffer no la trae.
+    ventana_duplicados: segundos dentro de los cuales dos marcajes del mismo empleado
+    se consideran un doble toque y se colapsan en uno.
+    fecha_inicio/fecha_fin (inclusivas), departamentos y empleados (Nombre o ID) restringen el
+    informe; se aplican lo antes posible en cada lector para no procesar filas descartadas.
+    feriados: días no laborables (ver calendario.cargar_calendario) para clasificar cada jornada;
+        siempre se suman los feriados nacionales de los años presentes.
+    devolver_descartados: si es True devuelve (tabla, descartados), donde descartados son las
+        filas separadas por limpiar_marcajes con su columna 'Motivo', para revisarlas o exportarlas.
+    """
+    filtro = construir_filtro(fecha_inicio, fecha_fin, departamentos, empleados)
+
     # Obtener la extensión del archivo
-    extension = os.path.splitext(filename)[1].lower()
+    filename, extension = abrir_origen(filename, nombre)
 
     if extension in ['.xlsx', '.xls']:
         print("Procesando archivo Excel...")
-        df = leer_excel(filename)
+        df = leer_excel(filename, filtro)
     elif extension == '.pdf':
         print("Procesando archivo PDF...")
-        df = load_pdf(filename)
+        df = load_pdf(filename, filtro)
+    elif extension == '.parquet':
+        print("Procesando archivo Parquet...")
+        df = load_parquet(filename, filtro)
     else:
         raise ValueError("Extensión no soportada para procesamiento.")
-    return transform_df(df)
 
-def load_pdf(path: str) -> pd.DataFrame:
+    # El rango de fechas se aplica al interpretarlas, antes de buscar duplicados
+    df, descartados, conteos = limpiar_marcajes(df, ventana_segundos=ventana_duplicados, filtro=filtro)
+    imprimir_resumen_limpieza(conteos, len(df) + len(descartados))
+    tabla = transform_df(df, feriados)
+    if devolver_descartados:
+        return tabla, descartados
+    return tabla
+
+def load_pdf(path, filtro=None) -> pd.DataFrame:
     """
-    Lee el PDF de marcajes y devuelve un DataFrame con columna 'Fecha/Hora' en datetime.
+    Lee el PDF de marcajes y devuelve un DataFrame con la columna 'Fecha/Hora' tal como viene.
+    La conversión a datetime la hace limpiar_marcajes para poder contar las fechas inválidas.
+    tabula no permite saltar filas, así que el filtro por departamento/empleado se aplica
+    apenas se extrae la tabla. Acepta ruta u objeto tipo archivo, aunque en este caso tabula
+    lo vuelca internamente a un temporal porque su motor Java solo lee desde disco.
     """
     df = tabula.read_pdf(path, pages="all", multiple_tables=False)[0]
     df.rename(columns={"ID de\rusuario": "ID"}, inplace=True)
     df.drop(columns=[col for col in df.columns if 'Unnamed' in col], inplace=True, errors='ignore')
-    df['Fecha/Hora'] = pd.to_datetime(df['Fecha/Hora'], errors='coerce')
-    return df
+    return filtrar_marcajes(df, filtro, incluir_fechas=False)
 
 
+def load_parquet(path, filtro=None) -> pd.DataFrame:
+    """
+    Lee una exportación de marcajes en Parquet. El rango de fechas se empuja al lector para
+    saltar row groups completos; si 'Fecha/Hora' no está guardada como timestamp se lee sin él.
+    """
+    filtros = filtros_parquet(filtro)
+    posicion = path.tell() if hasattr(path, 'tell') else None
+    try:
+        df = pd.read_parquet(path, filters=filtros)
+    except (TypeError, ValueError, NotImplementedError):
+        if filtros is None:
+            raise
+        if posicion is not None:
+            path.seek(posicion)
+        df = pd.read_parquet(path)
+    df.rename(columns={"Nro. de usuario": "ID"}, inplace=True)
+    return filtrar_marcajes(df, filtro, incluir_fechas=False)
+
+
+def leer_excel(archivo, filtro=None):
+    """
+    Lee el Excel de marcajes fila a fila con openpyxl en modo solo lectura. El encabezado es
+    la primera fila que contiene 'Departamento'; las filas sin Nombre o fuera del filtro se
+    descartan durante la lectura, sin llegar a construir el DataFrame.
+    """
+    libro = openpyxl.load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+
+        # Busca la fila que contiene 'Departamento'
+        for encabezado in filas:
+            if any('Departamento' in str(celda) for celda in encabezado if celda is not None):
+                break
+        else:
+            raise ValueError("No se encontró la fila de encabezado con 'Departamento'.")
+
+        columnas = [
+            str(celda).strip() if celda is not None else f"Unnamed: {i}"
+            for i, celda in enumerate(encabezado)
+        ]
+        columnas = ["ID" if c == "Nro. de usuario" else c for c in columnas]
+        posicion = {c: i for i, c in enumerate(columnas)}
+        n = len(columnas)
+
+        def celda(fila, columna):
+            i = posicion.get(columna)
+            return fila[i] if i is not None and i < len(fila) else None
+
+        registros = []
+        for fila in filas:
+            # Filtra las filas donde 'Nombre' no es nulo
+            if celda(fila, 'Nombre') is None:
+                continue
+            if not fila_cumple_filtro(filtro, celda(fila, 'Departamento'), celda(fila, 'ID'),
+                                      celda(fila, 'Nombre'), celda(fila, 'Fecha/Hora')):
+                continue
+            registros.append(tuple(fila[:n]) + (None,) * (n - len(fila)))
+    finally:
+        libro.close()
+
+    df = pd.DataFrame(registros, columns=columnas)
 
-def leer_excel(archivo):
-    # Lee el archivo Excel
-    df_raw = pd.read_excel(archivo, engine='openpyxl', header=None)
-    
-    # Busca la fila que contiene 'Departamento'
-    start_row = df_raw[df_raw.apply(lambda row: row.astype(str).str.contains('Departamento').any(), axis=1)].index[0]
-    
-    # Lee el archivo nuevamente, comenzando desde la fila encontrada
-    df = pd.read_excel(archivo, engine='openpyxl', header=start_row)
-    
-    # Filtra las filas donde 'Nombre' no es nulo
-    df = df[df['Nombre'].notna()]
-    
     # Elimina columnas completamente vacías
     df = df.dropna(axis=1, how='all')
-    
-    df.rename(columns={"Nro. de usuario": "ID"}, inplace=True)
-    
+
     return df
 
-def transform_df(df: pd.DataFrame) -> pd.DataFrame:
+def transform_df(df: pd.DataFrame, feriados=None) -> pd.DataFrame:
     """
     Procesa el dataframe de marcajes para obtener columnas básicas:
-    Entrada, Salida, Jornada, Mes, Día de semana, Fin de semana, Estado de marcaje (completo/incompleto).
+    Entrada, Salida, Jornada, Mes, Día de semana, Fin de semana, Estado de marcaje (completo/incompleto)
+    y Tipo_dia (Día de semana / Fin de semana / Feriado según los feriados nacionales de los años
+    de la tabla más los días no laborables indicados en feriados).
     """
     # Asegura formato de fecha y capitaliza nombres
     df['Fecha/Hora'] = pd.to_datetime(df['Fecha/Hora'], errors='coerce')
@@ -128,16 +254,19 @@ def transform_df(df: pd.DataFrame) -> pd.DataFrame:
     tabla['Mes'] = pd.to_datetime(tabla['Fecha']).dt.strftime('%B %Y')
     tabla['Dia_semana'] = tabla['Entrada'].dt.weekday
     tabla['Fin_de_semana'] = tabla['Dia_semana'] >= 5
+    tabla['Tipo_dia'] = clasificar_dias(tabla['Fecha'], feriados)
 
     return tabla
 
 def extraer_contexto_general(df: pd.DataFrame) -> dict:
     """
-    Extrae listas únicas de empleados, meses y departamentos del dataframe procesado.
+    Extrae listas únicas de empleados, meses (en orden cronológico) y departamentos del dataframe procesado.
     """
+    # Ordenar los meses por período y no por el texto ('Abril' no va antes de 'Enero')
+    periodos = pd.to_datetime(df['Fecha']).dt.to_period('M').dropna().unique()
     contexto = {
         'empleados': sorted(df['Nombre'].dropna().unique()),
-        'meses': sorted(df['Mes'].dropna().unique()),
+        'meses': [p.strftime('%B %Y') for p in sorted(periodos)],
         'departamento': sorted(df['Departamento'].dropna().unique()) if 'Departamento' in df.columns else [],
         'inicio': df['Fecha'].min(),
         'fin': df['Fecha'].max()
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from reportgen.processing import cuartiles_jornada, cuartiles_por_fila
+
+
+def preparar_exploracion_outliers(tabla: pd.DataFrame, sketches: dict = None) -> dict:
+    """
+    Prepara la exploración interactiva de días atípicos (p. ej. en Colab) sobre la tabla de
+    transform_df. Convierte las jornadas a horas una sola vez; los cuartiles de cada agrupación
+    se calculan la primera vez que se piden y quedan en caché dentro del dict devuelto.
+    """
+    return {
+        'tabla': tabla,
+        'horas': (tabla['Jornada'].dt.total_seconds() / 3600).to_numpy(),
+        'sketches': sketches,
+        'cache': {},
+    }
+
+
+def _estadisticas(exploracion: dict, agrupacion) -> dict:
+    """
+    Cuartiles por fila y códigos de grupo de una agrupación, calculados una vez y reutilizados.
+    """
+    clave = (agrupacion,) if isinstance(agrupacion, str) else tuple(agrupacion)
+    if clave not in exploracion['cache']:
+        tabla = exploracion['tabla']
+        cuartiles = cuartiles_jornada(tabla, agrupacion, exploracion['sketches'])
+        por_fila = cuartiles_por_fila(tabla, cuartiles, agrupacion)
+        codigos = tabla.groupby(list(clave), sort=True).ngroup().to_numpy()
+        exploracion['cache'][clave] = {
+            'cuartiles': cuartiles,
+            'q1': por_fila['Q1'].to_numpy(),
+            'q3': por_fila['Q3'].to_numpy(),
+            'codigos': codigos,
+        }
+    return exploracion['cache'][clave]
+
+
+def explorar_outliers(exploracion: dict, factor: float = 1.5, agrupacion='Nombre') -> dict:
+    """
+    Aplica un factor de IQR sobre las estadísticas en caché y devuelve:
+      'outliers': filas atípicas con columna 'Tipo' (Baja/Alta), igual que detect_outliers_jornada;
+      'conteos': DataFrame por grupo con Q1, Q3, Inferior, Superior, Baja, Alta y Total;
+      'factor' y 'agrupacion' usados (ver parametros_outliers).
+    Solo recalcula una máscara vectorizada, así que cambiar el factor es inmediato.
+    """
+    stats = _estadisticas(exploracion, agrupacion)
+    horas = exploracion['horas']
+    iqr = stats['q3'] - stats['q1']
+    with np.errstate(invalid='ignore'):
+        baja = horas < stats['q1'] - factor * iqr
+        alta = horas > stats['q3'] + factor * iqr
+
+    conteos = stats['cuartiles'].copy()
+    conteos['Inferior'] = conteos['Q1'] - factor * (conteos['Q3'] - conteos['Q1'])
+    conteos['Superior'] = conteos['Q3'] + factor * (conteos['Q3'] - conteos['Q1'])
+    # Los códigos de grupo siguen el orden del índice de cuartiles (ambos ordenados)
+    codigos = stats['codigos']
+    validos = codigos >= 0
+    n_grupos = len(conteos)
+    conteos['Baja'] = np.bincount(codigos[validos & baja], minlength=n_grupos)[:n_grupos]
+    conteos['Alta'] = np.bincount(codigos[validos & alta], minlength=n_grupos)[:n_grupos]
+    conteos['Total'] = conteos['Baja'] + conteos['Alta']
+
+    mascara = baja | alta
+    outliers = exploracion['tabla'].loc[mascara].copy()
+    outliers['Tipo'] = np.where(baja[mascara], 'Baja', 'Alta')
+    outliers = outliers.sort_values('Nombre', kind='mergesort').reset_index(drop=True)
+
+    return {'outliers': outliers, 'conteos': conteos, 'factor': factor, 'agrupacion': agrupacion}
+
+
+def parametros_outliers(resultado: dict) -> dict:
+    """
+    Traduce el resultado elegido de explorar_outliers a los argumentos de generar_informe:
+    generar_informe(df, **parametros_outliers(resultado)).
+    """
+    return {'factor_outliers': resultado['factor'], 'agrupacion_outliers': resultado['agrupacion']}
@@ -0,0 +1,132 @@
+import pandas as pd
+from datetime import datetime
+
+
+def _normalizar_valor(valor) -> str:
+    """
+    Texto comparable para IDs, nombres y departamentos: 'Ana López', 'ANA LÓPEZ' y 101.0/'101'
+    quedan iguales entre sí.
+    """
+    texto = str(valor).strip().lower()
+    return texto[:-2] if texto.endswith('.0') and texto[:-2].isdigit() else texto
+
+
+def _normalizar_serie(serie: pd.Series) -> pd.Series:
+    texto = serie.astype(str).str.strip().str.lower()
+    return texto.str.replace(r'^(\d+)\.0$', r'\1', regex=True)
+
+
+def construir_filtro(fecha_inicio=None, fecha_fin=None, departamentos=None, empleados=None):
+    """
+    Prepara un filtro de marcajes. fecha_inicio y fecha_fin son inclusivas (día completo);
+    departamentos y empleados aceptan un valor o una lista (empleados por Nombre o ID).
+    Devuelve None si no se pidió ningún filtro.
+    """
+    if fecha_inicio is None and fecha_fin is None and not departamentos and not empleados:
+        return None
+    if isinstance(departamentos, str):
+        departamentos = [departamentos]
+    if isinstance(empleados, (str, int, float)):
+        empleados = [empleados]
+    return {
+        'desde': pd.Timestamp(fecha_inicio).normalize() if fecha_inicio is not None else None,
+        'hasta': pd.Timestamp(fecha_fin).normalize() + pd.Timedelta(days=1) if fecha_fin is not None else None,
+        'departamentos': {_normalizar_valor(d) for d in departamentos} if departamentos else None,
+        'empleados': {_normalizar_valor(e) for e in empleados} if empleados else None,
+    }
+
+
+def fila_cumple_filtro(filtro, departamento=None, id_empleado=None, nombre=None, fecha_hora=None) -> bool:
+    """
+    Evalúa el filtro sobre una sola fila; lo usan los lectores que recorren el archivo
+    fila a fila para descartar temprano. Las fechas que no son datetime se dejan pasar
+    y se resuelven luego con filtrar_marcajes.
+    """
+    if filtro is None:
+        return True
+    if filtro['departamentos'] is not None and _normalizar_valor(departamento) not in filtro['departamentos']:
+        return False
+    if filtro['empleados'] is not None and not (
+        _normalizar_valor(id_empleado) in filtro['empleados'] or _normalizar_valor(nombre) in filtro['empleados']
+    ):
+        return False
+    if isinstance(fecha_hora, datetime):
+        desde, hasta = _limites_en_zona(filtro, fecha_hora.tzinfo)
+        if desde is not None and fecha_hora < desde:
+            return False
+        if hasta is not None and fecha_hora >= hasta:
+            return False
+    return True
+
+
+def _limites_en_zona(filtro, zona) -> tuple:
+    """
+    Devuelve (desde, hasta) en la zona horaria de las fechas a comparar: fechas con zona
+    no se pueden comparar contra límites sin zona.
+    """
+    limites = []
+    for limite in (filtro['desde'], filtro['hasta']):
+        if limite is not None and zona is not None:
+            limite = limite.tz_localize(zona)
+        limites.append(limite)
+    return tuple(limites)
+
+
+def mascara_fechas(fechas: pd.Series, filtro) -> pd.Series:
+    """
+    Máscara booleana de las fechas que caen dentro del rango del filtro.
+    Las fechas vacías o no interpretables quedan fuera.
+    """
+    if not pd.api.types.is_datetime64_any_dtype(fechas):
+        fechas = pd.to_datetime(fechas, errors='coerce')
+    mascara = pd.Series(True, index=fechas.index)
+    if filtro is None:
+        return mascara
+    desde, hasta = _limites_en_zona(filtro, fechas.dt.tz)
+    if desde is not None:
+        mascara &= fechas >= desde
+    if hasta is not None:
+        mascara &= fechas < hasta
+    return mascara
+
+
+def filtrar_marcajes(df: pd.DataFrame, filtro, columna_fecha: str = 'Fecha/Hora',
+                     incluir_fechas: bool = True) -> pd.DataFrame:
+    """
+    Aplica el filtro de forma vectorizada. Con incluir_fechas=False solo filtra por
+    departamento y empleado (las fechas las filtra limpiar_marcajes al interpretarlas).
+    """
+    if filtro is None or df.empty:
+        return df
+
+    mascara = pd.Series(True, index=df.index)
+    if filtro['departamentos'] is not None and 'Departamento' in df.columns:
+        mascara &= _normalizar_serie(df['Departamento']).isin(filtro['departamentos'])
+    if filtro['empleados'] is not None:
+        coincide = pd.Series(False, index=df.index)
+        for columna in ('ID', 'Nombre'):
+            if columna in df.columns:
+                coincide |= _normalizar_serie(df[columna]).isin(filtro['empleados'])
+        mascara &= coincide
+    if incluir_fechas and columna_fecha in df.columns:
+        mascara &= mascara_fechas(df[columna_fecha], filtro)
+
+    if mascara.all():
+        return df
+    return df.loc[mascara].reset_index(drop=True)
+
+
+def filtros_parquet(filtro):
+    """
+    Traduce el rango de fechas a filtros de pyarrow para descartar row groups completos
+    al leer. Departamento y empleado no se empujan porque se comparan sin distinguir
+    mayúsculas; los resuelve filtrar_marcajes sobre lo ya leído.
+    """
+    if filtro is None:
+        return None
+    condiciones = []
+    if filtro['desde'] is not None:
+        condiciones.append(('Fecha/Hora', '>=', filtro['desde']))
+    if filtro['hasta'] is not None:
+        condiciones.append(('Fecha/Hora', '<', filtro['hasta']))
+    return condiciones or None
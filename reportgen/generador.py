@@ -7,25 +7,77 @@ from reportgen.processing import (
     compute_resumen_mensual,
     detect_outliers_jornada,
     construir_resumen_fusionado,
-    agrupar_resumen_por_mes_y_tipo_dia
+    agrupar_resumen_por_mes_y_tipo_dia,
+    construir_indice_periodos,
+    comparar_periodos,
+    resumen_comparacion_periodos
 )
+from reportgen.graficos import preparar_datos_graficos, generar_graficos
+from reportgen.calendario import clasificar_dias, TIPO_FERIADO
+from reportgen.asistencia import (
+    construir_matriz_asistencia,
+    dias_esperados,
+    resumen_asistencia,
+    ausencias_por_persona_y_mes,
+    cobertura_por_departamento
+)
+from reportgen.filtros import construir_filtro, filtrar_marcajes
+from reportgen.cumplimiento import cargar_turnos, calcular_cumplimiento, resumen_cumplimiento_mensual
 import pandas as pd
+import os
 from datetime import timedelta
 
-def generar_informe(df_marcajes: pd.DataFrame, ruta_salida: str = "informe_jornadas.tex"):
+def generar_informe(df_marcajes: pd.DataFrame, ruta_salida="informe_jornadas.tex",
+                    turnos=None, tolerancia_minutos: float = 5, fecha_inicio=None, fecha_fin=None,
+                    departamentos=None, empleados=None, historial: pd.DataFrame = None, periodo_base=None,
+                    graficos: bool = True, feriados=None, sketches: dict = None,
+                    factor_outliers: float = 1.5, agrupacion_outliers='Nombre',
+                    directorio_graficos: str = None):
     """
     Genera un informe de jornadas a partir de un DataFrame de marcajes procesado.
     
     Args:
         df_marcajes: DataFrame de marcajes procesado (con columnas Nombre, Fecha, Entrada, Salida, Jornada).
-        ruta_salida: Ruta donde se guardará el informe LaTeX.
+        ruta_salida: Ruta donde se guardará el informe LaTeX, un objeto tipo archivo donde escribirlo,
+            o None para recibir el documento como io.BytesIO (UTF-8) sin escribirlo a disco.
+        turnos: Rol de turnos (DataFrame o ruta a .csv/.xlsx) para la sección de cumplimiento de horario
+            y para saber qué días se esperaba a cada empleado (si no, se usan los días hábiles).
+        tolerancia_minutos: Minutos de gracia antes de contar una entrada como tardía.
+        fecha_inicio, fecha_fin, departamentos, empleados: Restringen el informe (ver construir_filtro).
+            Conviene pasarlos también a procesar_archivo para no cargar filas que se descartarán.
+        historial: Tabla de jornadas de períodos anteriores (misma forma que df_marcajes) para comparar.
+            Se le aplican los mismos departamentos y empleados; los meses que ya trae df_marcajes se ignoran.
+        periodo_base: Mes base de la comparación ('AAAA-MM'); por defecto, el mismo mes del año anterior.
+        graficos: Si es True, agrega gráficos de tendencia (PDF en la carpeta 'graficos' junto al informe).
+            Si el informe no se escribe en una ruta (buffer o ruta_salida=None), solo se dibujan
+            cuando se indica directorio_graficos, para no escribir en el directorio de trabajo.
+        directorio_graficos: Carpeta donde guardar los gráficos. El informe los referencia con ruta
+            relativa a su propia ubicación, o con ruta absoluta si no se escribe en una ruta.
+        feriados: Días no laborables (ver calendario.cargar_calendario). Si se indican, reclasifican
+            la columna Tipo_dia que dejó transform_df. Para ausencias y cobertura también se toman
+            como no laborables las fechas que Tipo_dia ya marca como feriado; un día del calendario
+            en que nadie marcó solo se conoce si se pasa aquí el mismo calendario que a procesar_archivo.
+        sketches: Sketches de cuantiles por empleado (ver cuantiles.actualizar_sketches_jornada) para
+            calcular los límites de días atípicos con todo el historial acumulado.
+        factor_outliers, agrupacion_outliers: Factor de IQR y agrupación para los días atípicos
+            (ver exploracion.explorar_outliers y parametros_outliers para elegirlos).
     """
+    # Aplicar filtros antes de cualquier cálculo
+    filtro = construir_filtro(fecha_inicio, fecha_fin, departamentos, empleados)
+    df_marcajes = filtrar_marcajes(df_marcajes, filtro, columna_fecha='Entrada')
+    if df_marcajes.empty:
+        raise ValueError("Ningún marcaje coincide con los filtros indicados.")
+
+    # Clasificación del día (semana / fin de semana / feriado), calculada una sola vez
+    if feriados is not None or 'Tipo_dia' not in df_marcajes.columns:
+        df_marcajes = df_marcajes.assign(Tipo_dia=clasificar_dias(df_marcajes['Fecha'], feriados))
+
     # Extraer información de contexto
     departamento = df_marcajes['Departamento'].iloc[0] if 'Departamento' in df_marcajes.columns else "No especificado"
     empleados = sorted(df_marcajes['Nombre'].unique())
     
     # Detectar outliers
-    outliers = detect_outliers_jornada(df_marcajes)
+    outliers = detect_outliers_jornada(df_marcajes, factor_outliers, sketches, agrupacion_outliers)
     
     # Preparar datos para el informe (mantener versiones originales para compatibilidad)
     detalles_marcajes = get_detalles_marcajes(df_marcajes)
@@ -42,6 +94,55 @@ def generar_informe(df_marcajes: pd.DataFrame, ruta_salida: str = "informe_jorna
     # Generar también el formato antiguo para compatibilidad
     resumen_por_mes_y_tipo_dia = agrupar_resumen_por_mes_y_tipo_dia(resumen_fusionado)
     
+    # Cumplimiento de horario contra el rol de turnos (opcional)
+    resumen_cumplimiento = {}
+    if turnos is not None:
+        turnos = cargar_turnos(turnos)
+        cumplimiento = calcular_cumplimiento(df_marcajes, turnos, tolerancia_minutos)
+        resumen_cumplimiento = resumen_cumplimiento_mensual(cumplimiento)
+    
+    # Ausencias y cobertura a partir de la matriz empleado × fecha. Los feriados ya marcados en
+    # Tipo_dia (p. ej. por procesar_archivo con el calendario del hospital) tampoco son laborables
+    feriados_tabla = pd.to_datetime(df_marcajes.loc[df_marcajes['Tipo_dia'] == TIPO_FERIADO, 'Fecha'])
+    no_laborables = list(feriados_tabla.unique()) + (list(feriados) if feriados is not None else [])
+    matriz_asistencia = construir_matriz_asistencia(df_marcajes)
+    esperado = dias_esperados(matriz_asistencia, no_laborables, turnos)
+    resumen_ausencias = resumen_asistencia(matriz_asistencia, esperado)
+    ausencias_por_mes = ausencias_por_persona_y_mes(matriz_asistencia, esperado)
+    cobertura = cobertura_por_departamento(matriz_asistencia, no_laborables)
+    
+    # Comparación contra el año anterior o un período base
+    indice_informe = construir_indice_periodos(df_marcajes)
+    periodos_informe = indice_informe.index.unique(level='Periodo')
+    if historial is not None:
+        # El historial se restringe a los mismos departamentos/empleados (no a las fechas,
+        # que son justamente anteriores) y se descartan los meses que ya trae df_marcajes
+        historial = filtrar_marcajes(historial, filtro, columna_fecha='Entrada', incluir_fechas=False)
+        historial = historial[~pd.to_datetime(historial['Fecha']).dt.to_period('M').isin(periodos_informe)]
+        indice_periodos = construir_indice_periodos(pd.concat([historial, df_marcajes], ignore_index=True))
+    else:
+        indice_periodos = indice_informe
+    comparacion_empleados = resumen_comparacion_periodos(
+        comparar_periodos(indice_periodos, periodo_base), periodos_informe
+    )
+    comparacion_departamentos = resumen_comparacion_periodos(
+        comparar_periodos(indice_periodos, periodo_base, nivel='Departamento'), periodos_informe
+    )
+    
+    # Gráficos de tendencia: se dibujan en Python y LaTeX solo los incluye
+    rutas_graficos = {}
+    en_disco = isinstance(ruta_salida, (str, os.PathLike))
+    if graficos and (en_disco or directorio_graficos is not None):
+        directorio_informe = os.path.dirname(os.path.abspath(ruta_salida)) if en_disco else None
+        if directorio_graficos is None:
+            directorio_graficos = os.path.join(directorio_informe, 'graficos')
+        especificaciones = preparar_datos_graficos(indice_informe, resumen_fusionado, outliers)
+        rutas = generar_graficos(especificaciones, directorio_graficos)
+        rutas_graficos = {
+            nombre: (os.path.relpath(ruta, directorio_informe) if en_disco else os.path.abspath(ruta)).replace(os.sep, '/')
+            for nombre, ruta in rutas.items()
+        }
+    
     # Asegurarse de que cada empleado tenga una entrada en outliers_por_persona
     for empleado in empleados:
         if empleado not in outliers_por_persona:
@@ -67,12 +168,18 @@ def generar_informe(df_marcajes: pd.DataFrame, ruta_salida: str = "informe_jorna
         # Agregar las nuevas estructuras organizadas por mes
         'detalles_marcajes_por_mes': detalles_marcajes_por_mes,
         'outliers_por_persona_y_mes': outliers_por_persona_y_mes,
+        'resumen_cumplimiento': resumen_cumplimiento,
+        'tolerancia_minutos': tolerancia_minutos,
+        'comparacion_empleados': comparacion_empleados,
+        'comparacion_departamentos': comparacion_departamentos,
+        'graficos': rutas_graficos,
+        'resumen_ausencias': resumen_ausencias,
+        'ausencias_por_persona_y_mes': ausencias_por_mes,
+        'cobertura': cobertura,
         'mes_inicio' : inicio_fechas_v.strftime('%B').capitalize(),
         'mes_fin' : final_fechas_v.strftime('%B').capitalize(),
         'año' : inicio_fechas_v.strftime('%Y')
     }
     
     # Renderizar el informe
-    render_report(contexto, ruta_salida)
-    
-    return ruta_salida
\ No newline at end of file
+    return render_report(contexto, ruta_salida)
\ No newline at end of file
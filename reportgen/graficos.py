@@ -0,0 +1,139 @@
+import hashlib
+import importlib.util
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# Cambiar este valor invalida la caché cuando cambia el estilo de los gráficos
+VERSION_ESTILO = 1
+
+COLOR_CORPORATIVO = (125 / 255, 0, 0)
+COLORES_SERIES = [COLOR_CORPORATIVO, (0.6, 0.6, 0.6), (0.85, 0.55, 0.2), (0.3, 0.3, 0.3)]
+
+
+def preparar_datos_graficos(indice_periodos: pd.DataFrame, resumen_fusionado: list,
+                            outliers: pd.DataFrame) -> dict:
+    """
+    Reduce los datos que ya prepara generar_informe a especificaciones simples (listas y números)
+    para cada gráfico: nombre → {'titulo', 'eje_y', 'etiquetas', 'series', 'apilado'}.
+    Son serializables, de modo que sirven tanto para enviarlas a otro proceso como para la caché.
+    """
+    periodos = list(indice_periodos.index.unique(level='Periodo'))
+    etiquetas = [p.strftime('%b %Y') for p in periodos]
+    especificaciones = {}
+
+    horas_mes = indice_periodos.groupby(level='Periodo')['Horas'].sum().reindex(periodos, fill_value=0)
+    especificaciones['horas_por_mes'] = {
+        'titulo': 'Horas trabajadas por mes',
+        'eje_y': 'Horas',
+        'etiquetas': etiquetas,
+        'series': {'Horas': [round(float(h), 2) for h in horas_mes]},
+        'apilado': False,
+    }
+
+    if resumen_fusionado:
+        resumen = pd.DataFrame(resumen_fusionado)
+        por_tipo = resumen.pivot_table(index='Periodo', columns='Tipo_dia', values='Total_horas',
+                                       aggfunc='sum', fill_value=0).reindex(periodos, fill_value=0)
+        especificaciones['horas_por_tipo_dia'] = {
+            'titulo': 'Horas por tipo de día',
+            'eje_y': 'Horas',
+            'etiquetas': etiquetas,
+            'series': {tipo: [round(float(h), 2) for h in por_tipo[tipo]] for tipo in por_tipo.columns},
+            'apilado': True,
+        }
+
+    conteo = pd.DataFrame(0, index=periodos, columns=['Baja', 'Alta'])
+    if outliers is not None and not outliers.empty:
+        periodo_outlier = pd.to_datetime(outliers['Fecha']).dt.to_period('M')
+        conteo = (outliers.groupby([periodo_outlier, 'Tipo']).size().unstack(fill_value=0)
+                  .reindex(index=periodos, columns=['Baja', 'Alta'], fill_value=0))
+    especificaciones['outliers_por_mes'] = {
+        'titulo': 'Días atípicos por mes',
+        'eje_y': 'Días',
+        'etiquetas': etiquetas,
+        'series': {tipo: [int(c) for c in conteo[tipo]] for tipo in conteo.columns},
+        'apilado': True,
+    }
+    return especificaciones
+
+
+def _clave_cache(especificacion: dict) -> str:
+    contenido = json.dumps({'version': VERSION_ESTILO, **especificacion}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:16]
+
+
+def _dibujar_grafico(especificacion: dict, ruta: str):
+    """
+    Dibuja un gráfico de barras como PDF vectorial. Se ejecuta en un proceso de trabajo,
+    por eso importa matplotlib (backend sin pantalla) adentro.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    etiquetas = especificacion['etiquetas']
+    posiciones = range(len(etiquetas))
+    fig, ax = plt.subplots(figsize=(6.3, 2.8))
+
+    acumulado = [0] * len(etiquetas)
+    series = especificacion['series']
+    ancho = 0.8 if especificacion['apilado'] else 0.8 / max(len(series), 1)
+    for i, (nombre, valores) in enumerate(series.items()):
+        color = COLORES_SERIES[i % len(COLORES_SERIES)]
+        if especificacion['apilado']:
+            ax.bar(posiciones, valores, ancho, bottom=acumulado, label=nombre, color=color)
+            acumulado = [a + v for a, v in zip(acumulado, valores)]
+        else:
+            ax.bar([p + i * ancho for p in posiciones], valores, ancho, label=nombre, color=color)
+
+    ax.set_title(especificacion['titulo'], fontsize=10, color=COLOR_CORPORATIVO)
+    ax.set_ylabel(especificacion['eje_y'], fontsize=8)
+    ax.set_xticks(list(posiciones))
+    ax.set_xticklabels(etiquetas, rotation=45, ha='right', fontsize=7)
+    ax.tick_params(axis='y', labelsize=7)
+    ax.spines[['top', 'right']].set_visible(False)
+    if len(series) > 1:
+        ax.legend(fontsize=7, frameon=False)
+    fig.tight_layout()
+
+    # Escribir a un temporal y renombrar evita dejar en la caché un PDF a medio escribir
+    temporal = ruta + '.tmp'
+    fig.savefig(temporal, format='pdf')
+    plt.close(fig)
+    os.replace(temporal, ruta)
+    return ruta
+
+
+def generar_graficos(especificaciones: dict, directorio: str = 'graficos', procesos: int = None) -> dict:
+    """
+    Genera los PDFs de los gráficos en directorio y devuelve dict: nombre → ruta.
+    Cada archivo se nombra con el hash de sus datos, así que un gráfico cuyos datos no cambiaron
+    se reutiliza sin volver a dibujarlo. Los faltantes se dibujan en paralelo en procesos aparte.
+    Si matplotlib no está instalado, no se generan gráficos y se devuelve un dict vacío.
+    """
+    if importlib.util.find_spec('matplotlib') is None:
+        print("Advertencia: matplotlib no está instalado; el informe se generará sin gráficos.")
+        return {}
+
+    os.makedirs(directorio, exist_ok=True)
+    rutas = {}
+    pendientes = {}
+    for nombre, especificacion in especificaciones.items():
+        ruta = os.path.join(directorio, f"{nombre}-{_clave_cache(especificacion)}.pdf")
+        rutas[nombre] = ruta
+        if not os.path.exists(ruta):
+            pendientes[nombre] = especificacion
+
+    if len(pendientes) == 1:
+        nombre, especificacion = next(iter(pendientes.items()))
+        _dibujar_grafico(especificacion, rutas[nombre])
+    elif pendientes:
+        with ProcessPoolExecutor(max_workers=procesos or min(len(pendientes), os.cpu_count() or 1)) as pool:
+            tareas = [pool.submit(_dibujar_grafico, esp, rutas[nombre]) for nombre, esp in pendientes.items()]
+            for tarea in tareas:
+                tarea.result()
+
+    return rutas
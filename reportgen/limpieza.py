@@ -0,0 +1,95 @@
+import pandas as pd
+
+from reportgen.filtros import mascara_fechas
+
+# Columnas que identifican a un empleado en los marcajes crudos
+CLAVES_EMPLEADO = ['Departamento', 'ID', 'Nombre']
+
+# Motivos de descarte reportados por limpiar_marcajes
+MOTIVO_FECHA_VACIA = 'Fecha vacía'
+MOTIVO_FECHA_INVALIDA = 'Fecha inválida'
+MOTIVO_SIN_EMPLEADO = 'Sin identificación'
+MOTIVO_IDENTIFICACION_INCOMPLETA = 'Identificación incompleta'
+MOTIVO_DUPLICADO = 'Marcaje duplicado'
+
+
+def limpiar_marcajes(df: pd.DataFrame, ventana_segundos: float = 60, filtro=None) -> tuple:
+    """
+    Depura los marcajes crudos antes de transform_df.
+
+    - Convierte 'Fecha/Hora' a datetime y separa las filas vacías o no interpretables
+      (en lugar de dejarlas convertirse en NaT y desaparecer en silencio).
+    - Si se indica un filtro (ver filtros.construir_filtro), quita las filas fuera de su rango
+      de fechas antes de seguir, así el resto de la limpieza trabaja sobre menos filas.
+      Esas filas no cuentan como descartadas.
+    - Separa las filas sin Nombre ni ID, y aparte las que tienen vacío solo alguno de
+      Departamento, ID o Nombre (transform_df agrupa por esas columnas y las perdería).
+    - Colapsa los marcajes de un mismo empleado separados por ventana_segundos o menos
+      (dobles toques en el reloj), conservando el primero de cada ráfaga.
+
+    Todo se calcula con máscaras y diferencias agrupadas, sin recorrer filas.
+    Devuelve (df_limpio, descartados, conteos): descartados conserva las filas separadas
+    con una columna 'Motivo' y conteos es un dict Motivo → cantidad de filas.
+    """
+    df = df.reset_index(drop=True)
+    original = df['Fecha/Hora']
+    fecha_hora = pd.to_datetime(original, errors='coerce')
+    # El formato se infiere de la primera fila; solo las que fallan se reintentan una a una
+    reintentar = fecha_hora.isna() & original.notna()
+    if reintentar.any():
+        reintento = pd.to_datetime(original[reintentar], errors='coerce', format='mixed')
+        fecha_hora = fecha_hora.combine_first(reintento)
+
+    if filtro is not None:
+        # Las fechas inválidas se conservan para reportarlas en descartados
+        dentro = mascara_fechas(fecha_hora, filtro) | fecha_hora.isna()
+        if not dentro.all():
+            df = df.loc[dentro].reset_index(drop=True)
+            original = original[dentro].reset_index(drop=True)
+            fecha_hora = fecha_hora[dentro].reset_index(drop=True)
+
+    motivo = pd.Series(pd.NA, index=df.index, dtype='object')
+    motivo[fecha_hora.isna() & original.notna()] = MOTIVO_FECHA_INVALIDA
+    motivo[original.isna()] = MOTIVO_FECHA_VACIA
+
+    claves = [c for c in CLAVES_EMPLEADO if c in df.columns]
+    identificadores = [c for c in ('ID', 'Nombre') if c in df.columns]
+    if identificadores:
+        sin_empleado = df[identificadores].isna().all(axis=1)
+        motivo[sin_empleado & motivo.isna()] = MOTIVO_SIN_EMPLEADO
+    if claves:
+        incompleto = df[claves].isna().any(axis=1)
+        motivo[incompleto & motivo.isna()] = MOTIVO_IDENTIFICACION_INCOMPLETA
+
+    # Duplicados: diferencia con el marcaje anterior del mismo empleado
+    validos = motivo.isna()
+    ordenado = df.loc[validos, claves].assign(**{'Fecha/Hora': fecha_hora[validos]})
+    ordenado = ordenado.sort_values(claves + ['Fecha/Hora'], kind='mergesort')
+    if claves:
+        diferencia = ordenado.groupby(claves, sort=False, dropna=False)['Fecha/Hora'].diff()
+    else:
+        diferencia = ordenado['Fecha/Hora'].diff()
+    duplicado = diferencia <= pd.Timedelta(seconds=ventana_segundos)
+    motivo[duplicado[duplicado].index] = MOTIVO_DUPLICADO
+
+    df['Fecha/Hora'] = fecha_hora
+    descartar = motivo.notna()
+    descartados = df.loc[descartar].assign(Motivo=motivo[descartar])
+    descartados['Fecha/Hora Original'] = original[descartar]
+    limpio = df.loc[~descartar].reset_index(drop=True)
+
+    conteos = descartados['Motivo'].value_counts().to_dict()
+    return limpio, descartados.reset_index(drop=True), conteos
+
+
+def imprimir_resumen_limpieza(conteos: dict, total: int):
+    """
+    Muestra en consola cuántas filas se descartaron por cada motivo.
+    """
+    if not conteos:
+        print(f"Limpieza: {total} marcajes válidos, ninguno descartado.")
+        return
+    descartados = sum(conteos.values())
+    print(f"Limpieza: {total - descartados} de {total} marcajes conservados.")
+    for motivo, cantidad in sorted(conteos.items(), key=lambda x: -x[1]):
+        print(f"  - {motivo}: {cantidad}")
@@ -1,12 +1,17 @@
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from collections import defaultdict
+from reportgen.cuantiles import cuantiles_sketch
+from reportgen.calendario import clasificar_dias
 
 def get_detalles_marcajes(tabla: pd.DataFrame) -> dict:
     """
     Convierte el DataFrame de marcajes en un dict: Nombre → lista de registros.
-    Cada registro es un dict con claves Fecha, Entrada, Salida, Jornada.
+    Cada registro es un dict con claves Fecha, Entrada, Salida, Jornada, Tipo_dia.
     """
+    if 'Tipo_dia' not in tabla.columns:
+        tabla = tabla.assign(Tipo_dia=clasificar_dias(tabla['Fecha']))
     detalles = {}
     for nombre, grp in tabla.groupby('Nombre'):
         registros = []
@@ -15,7 +20,8 @@ def get_detalles_marcajes(tabla: pd.DataFrame) -> dict:
                 'Fecha': row['Fecha'],
                 'Entrada': row['Entrada'],
                 'Salida': row['Salida'],
-                'Jornada': row['Jornada']
+                'Jornada': row['Jornada'],
+                'Tipo_dia': row['Tipo_dia']
             })
         detalles[nombre] = registros
     return detalles
@@ -56,36 +62,80 @@ def compute_resumen_mensual(detalles_marcajes: dict) -> dict:
     return resumen
 
 
-def detect_outliers_jornada(tabla: pd.DataFrame, factor: float = 1.5) -> pd.DataFrame:
+def _claves_agrupacion(agrupacion) -> list:
+    return [agrupacion] if isinstance(agrupacion, str) else list(agrupacion)
+
+
+def cuartiles_jornada(tabla: pd.DataFrame, agrupacion='Nombre', sketches: dict = None) -> pd.DataFrame:
     """
-    Detecta outliers en la duración de la jornada por IQR para cada persona.
-    Devuelve un DataFrame con las filas atípicas e incluye columna 'Tipo' (Baja/Alta).
+    Calcula Q1 y Q3 de las horas por jornada de cada grupo (por defecto cada persona; también
+    p. ej. ['Nombre', 'Mes'] o 'Departamento') en un solo groupby.
+    Si se agrupa por Nombre, las personas presentes en sketches (ver cuantiles.py) toman sus
+    cuartiles del sketch, que resume todo su historial sin volver a leerlo.
+    Devuelve un DataFrame indexado por grupo con columnas Q1 y Q3.
     """
-    lista_outliers = []
-    for nombre, grp in tabla.groupby('Nombre'):
-        horas = grp['Jornada'].dt.total_seconds() / 3600
-        q1, q3 = horas.quantile([0.25, 0.75])
-        iqr = q3 - q1
-        lower = q1 - factor * iqr
-        upper = q3 + factor * iqr
-        mask = (horas < lower) | (horas > upper)
-        out = grp.loc[mask].copy()
-        out['Tipo'] = out['Jornada'].apply(
-            lambda j: 'Baja' if (j.total_seconds()/3600) < lower else 'Alta'
-        )
-        lista_outliers.append(out)
-    if lista_outliers:
-        return pd.concat(lista_outliers).reset_index(drop=True)
+    claves = _claves_agrupacion(agrupacion)
+    horas = tabla['Jornada'].dt.total_seconds() / 3600
+    cuartiles = horas.groupby([tabla[c] for c in claves]).quantile([0.25, 0.75]).unstack()
+    cuartiles.columns = ['Q1', 'Q3']
+    if sketches and claves == ['Nombre']:
+        for nombre in cuartiles.index.intersection(list(sketches)):
+            cuartiles.loc[nombre, ['Q1', 'Q3']] = cuantiles_sketch(sketches[nombre], [0.25, 0.75])
+    return cuartiles
+
+
+def cuartiles_por_fila(tabla: pd.DataFrame, cuartiles: pd.DataFrame, agrupacion='Nombre') -> pd.DataFrame:
+    """
+    Alinea los cuartiles de cada grupo con las filas de la tabla (mismo índice que tabla).
+    """
+    claves = _claves_agrupacion(agrupacion)
+    if len(claves) == 1:
+        grupos = pd.Index(tabla[claves[0]])
     else:
+        grupos = pd.MultiIndex.from_frame(tabla[claves])
+    por_fila = cuartiles.reindex(grupos)
+    por_fila.index = tabla.index
+    return por_fila
+
+
+def limites_outliers(tabla: pd.DataFrame, factor: float = 1.5, sketches: dict = None,
+                     agrupacion='Nombre') -> pd.DataFrame:
+    """
+    Calcula por grupo Q1, Q3 y los límites Inferior/Superior (Q1 - factor·IQR, Q3 + factor·IQR)
+    de las horas por jornada. Devuelve un DataFrame indexado por grupo.
+    """
+    cuartiles = cuartiles_jornada(tabla, agrupacion, sketches)
+    iqr = cuartiles['Q3'] - cuartiles['Q1']
+    cuartiles['Inferior'] = cuartiles['Q1'] - factor * iqr
+    cuartiles['Superior'] = cuartiles['Q3'] + factor * iqr
+    return cuartiles
+
+
+def detect_outliers_jornada(tabla: pd.DataFrame, factor: float = 1.5, sketches: dict = None,
+                            agrupacion='Nombre') -> pd.DataFrame:
+    """
+    Detecta outliers en la duración de la jornada por IQR para cada persona
+    (o para cada grupo indicado en agrupacion).
+    Devuelve un DataFrame con las filas atípicas e incluye columna 'Tipo' (Baja/Alta).
+    Con sketches, los cuartiles de cada persona provienen de su historial acumulado.
+    """
+    limites = cuartiles_por_fila(tabla, limites_outliers(tabla, factor, sketches, agrupacion), agrupacion)
+    horas = tabla['Jornada'].dt.total_seconds() / 3600
+    mask = (horas < limites['Inferior']) | (horas > limites['Superior'])
+    if not mask.any():
         # Ningún outlier detectado, devolver DataFrame vacío con mismas columnas
         cols = list(tabla.columns) + ['Tipo']
         return pd.DataFrame(columns=cols)
+    out = tabla.loc[mask].copy()
+    out['Tipo'] = np.where(horas[mask] < limites.loc[mask, 'Inferior'], 'Baja', 'Alta')
+    return out.sort_values('Nombre', kind='mergesort').reset_index(drop=True)
 
 
 def construir_resumen_fusionado(detalles_marcajes: dict) -> list:
     """
     Construye un resumen fusionado por Mes, Tipo de Día y Empleado
-    basado en los detalles de marcajes.
+    basado en los detalles de marcajes, con los meses en orden cronológico
+    (cada registro conserva su Periodo además de la etiqueta Mes).
     """
     registros = []
     for nombre, registros_empleado in detalles_marcajes.items():
@@ -93,20 +143,25 @@ def construir_resumen_fusionado(detalles_marcajes: dict) -> list:
             registros.append({
                 "Nombre": nombre,
                 "Fecha": pd.to_datetime(r["Fecha"]),
-                "Horas_trabajadas": r["Jornada"].total_seconds() / 3600
+                "Horas_trabajadas": r["Jornada"].total_seconds() / 3600,
+                "Tipo_dia": r.get("Tipo_dia")
             })
 
     df = pd.DataFrame(registros)
     if df.empty:
         return []
 
-    df["Mes"] = df["Fecha"].dt.strftime("%B %Y")
-    df["Tipo_dia"] = df["Fecha"].dt.weekday.apply(lambda x: "Fin de semana" if x >= 5 else "Día de semana")
+    # Se agrupa por Periodo para que los meses queden en orden cronológico; Mes es solo la etiqueta
+    df["Periodo"] = df["Fecha"].dt.to_period("M")
+    # Tipo_dia viene precalculado (con feriados) desde transform_df; solo se completa si falta
+    if df["Tipo_dia"].isna().any():
+        df["Tipo_dia"] = df["Tipo_dia"].fillna(clasificar_dias(df["Fecha"]))
 
-    resumen = df.groupby(["Mes", "Tipo_dia", "Nombre"]).agg(
+    resumen = df.groupby(["Periodo", "Tipo_dia", "Nombre"]).agg(
         Dias_trabajados=("Fecha", "count"),
         Total_horas=("Horas_trabajadas", "sum")
     ).reset_index()
+    resumen.insert(0, "Mes", resumen["Periodo"].dt.strftime("%B %Y"))
 
     return resumen.to_dict(orient="records")
 
@@ -156,12 +211,14 @@ def get_detalles_marcajes_por_mes(tabla: pd.DataFrame) -> dict:
     """
     Convierte el DataFrame de marcajes en un dict:
     {Nombre: {Mes: [registros]}}
-    Cada registro es un dict con claves Fecha, Entrada, Salida, Jornada.
+    Cada registro es un dict con claves Fecha, Entrada, Salida, Jornada, Tipo_dia.
     Se asegura de que 'Jornada' sea un objeto datetime.timedelta nativo de Python.
     Los meses se ordenan cronológicamente.
     """
     detalles = {}
     tabla_copia = tabla.copy()
+    if 'Tipo_dia' not in tabla_copia.columns:
+        tabla_copia['Tipo_dia'] = clasificar_dias(tabla_copia['Fecha'])
 
     if not pd.api.types.is_datetime64_any_dtype(tabla_copia['Fecha']):
         tabla_copia['Fecha'] = pd.to_datetime(tabla_copia['Fecha'])
@@ -193,7 +250,8 @@ def get_detalles_marcajes_por_mes(tabla: pd.DataFrame) -> dict:
                     'Fecha': row['Fecha'],
                     'Entrada': row['Entrada'],
                     'Salida': row['Salida'],
-                    'Jornada': jornada_python
+                    'Jornada': jornada_python,
+                    'Tipo_dia': row['Tipo_dia']
                 })
             if registros:
                 # Almacenar el nombre legible del mes usando strftime
@@ -235,4 +293,76 @@ def compute_outliers_por_persona_y_mes(outliers: pd.DataFrame) -> dict:
         for mes, mes_grp in grp.groupby('Mes'):
             resultado[nombre][mes] = mes_grp.to_dict('records')
             
-    return resultado
\ No newline at end of file
+    return resultado
+
+def construir_indice_periodos(tabla: pd.DataFrame) -> pd.DataFrame:
+    """
+    Resume la tabla de jornadas por mes, departamento y empleado.
+    Devuelve un DataFrame con columnas Horas y Dias indexado por (Periodo, Departamento, Nombre),
+    donde Periodo es un pd.Period mensual: el índice queda ordenado cronológicamente y se puede
+    consultar por rangos con .loc sin volver a recorrer los marcajes.
+    """
+    fechas = pd.to_datetime(tabla['Fecha'])
+    df = pd.DataFrame({
+        'Periodo': fechas.dt.to_period('M'),
+        'Departamento': tabla['Departamento'] if 'Departamento' in tabla.columns else 'No especificado',
+        'Nombre': tabla['Nombre'],
+        'Horas': tabla['Jornada'].dt.total_seconds() / 3600,
+        'Fecha': fechas,
+    })
+    indice = df.groupby(['Periodo', 'Departamento', 'Nombre']).agg(
+        Horas=('Horas', 'sum'),
+        Dias=('Fecha', 'nunique')
+    )
+    return indice.sort_index()
+
+
+def comparar_periodos(indice: pd.DataFrame, periodo_base=None, nivel: str = 'Nombre') -> pd.DataFrame:
+    """
+    Compara cada período del índice contra una base en un solo join alineado.
+    Sin periodo_base, la base es el mismo mes del año anterior; con periodo_base (p. ej. '2024-01')
+    todos los meses se comparan contra ese mes.
+    nivel='Departamento' agrega los empleados de cada departamento antes de comparar.
+    Agrega las columnas Horas_base, Dias_base, Delta_horas, Delta_dias y Variacion_horas (%).
+    """
+    if nivel == 'Departamento':
+        datos = indice.groupby(level=['Periodo', 'Departamento']).sum()
+    else:
+        datos = indice
+
+    if periodo_base is None:
+        # Desplazar el índice 12 meses alinea cada mes con el mismo mes del año siguiente
+        base = datos.copy()
+        base.index = base.index.set_levels(base.index.levels[0] + 12, level='Periodo')
+    else:
+        periodo_base = pd.Period(periodo_base, freq='M')
+        if periodo_base not in datos.index.get_level_values('Periodo'):
+            raise ValueError(f"El período base {periodo_base} no tiene marcajes (revise el historial y los filtros).")
+        base = datos.xs(periodo_base, level='Periodo')
+
+    comparacion = datos.join(base.add_suffix('_base'), how='left')
+    comparacion['Delta_horas'] = comparacion['Horas'] - comparacion['Horas_base']
+    comparacion['Delta_dias'] = comparacion['Dias'] - comparacion['Dias_base']
+    comparacion['Variacion_horas'] = comparacion['Delta_horas'] / comparacion['Horas_base'].where(comparacion['Horas_base'] > 0) * 100
+    if periodo_base is None:
+        comparacion['Periodo_base'] = comparacion.index.get_level_values('Periodo') - 12
+    else:
+        comparacion['Periodo_base'] = periodo_base
+    return comparacion
+
+
+def resumen_comparacion_periodos(comparacion: pd.DataFrame, periodos=None) -> list:
+    """
+    Convierte el resultado de comparar_periodos en una lista de dicts para la plantilla,
+    conservando solo las filas con base disponible y, si se indica, los períodos pedidos.
+    Agrega las etiquetas legibles Mes y Mes_base.
+    """
+    df = comparacion[comparacion['Horas_base'].notna()]
+    if periodos is not None:
+        df = df[df.index.get_level_values('Periodo').isin(periodos)]
+    if df.empty:
+        return []
+    df = df.reset_index()
+    df['Mes'] = df['Periodo'].dt.strftime('%B %Y')
+    df['Mes_base'] = df['Periodo_base'].dt.strftime('%B %Y')
+    return df.drop(columns=['Periodo', 'Periodo_base']).to_dict('records')
@@ -1,3 +1,4 @@
+import io
 from jinja2 import Template
 from datetime import datetime, timedelta
 
@@ -140,7 +141,7 @@ LATEX_TEMPLATE = r"""
 \section{Resumen General}
 
 \infobox{Horas trabajadas por período, tipo de día y empleado}{
-  A continuación se presenta el detalle de los días trabajados, horas totales y promedio de jornada por empleado, diferenciando entre días de semana y fines de semana.
+  A continuación se presenta el detalle de los días trabajados, horas totales y promedio de jornada por empleado, diferenciando entre días de semana, fines de semana y feriados.
 }
 
 {% if resumen_fusionado %}
@@ -187,6 +188,29 @@ LATEX_TEMPLATE = r"""
 \caption{Detalle de fines de semana para todos los períodos}
 \end{table}
 
+{% if resumen_fusionado|selectattr("Tipo_dia", "equalto", "Feriado")|list %}
+\subsection{Feriados}
+
+\vspace{0.5cm}
+\begin{table}[H]
+\centering
+\mejoradatabla{
+\begin{tabular}{>{\bfseries}lllrr}
+\toprule
+\rowcolor{grisclaro} \textbf{Mes} & \textbf{Empleado} & \textbf{Días} & \textbf{Total Hrs} & \textbf{Promedio Jornada}\\
+\midrule
+{% for row in resumen_fusionado %}
+{% if row.Tipo_dia == "Feriado" %}
+{{ row.Mes }} & {{ row.Nombre }} & {{ row.Dias_trabajados }} & {{ "%.2f"|format(row.Total_horas) }} & {{ "%.2f"|format(row.Total_horas / row.Dias_trabajados) }}\\
+{% endif %}
+{% endfor %}
+\bottomrule
+\end{tabular}
+}
+\caption{Detalle de feriados para todos los períodos}
+\end{table}
+{% endif %}
+
 {% else %}
 % Formato anterior (por si no está disponible resumen_fusionado)
 {% for mes, tipos_dia in resumen_por_mes_y_tipo_dia.items() %}
@@ -219,6 +243,149 @@ LATEX_TEMPLATE = r"""
 {% endif %}
 {% endif %}
 
+{% if graficos %}
+\clearpage
+
+\section{Tendencias}
+
+{% if graficos.horas_por_mes %}
+\begin{figure}[H]
+\centering
+\includegraphics[width=\textwidth]{ {{- graficos.horas_por_mes -}} }
+\caption{Horas trabajadas por mes}
+\end{figure}
+{% endif %}
+
+{% if graficos.horas_por_tipo_dia %}
+\begin{figure}[H]
+\centering
+\includegraphics[width=\textwidth]{ {{- graficos.horas_por_tipo_dia -}} }
+\caption{Horas por tipo de día}
+\end{figure}
+{% endif %}
+
+{% if graficos.outliers_por_mes %}
+\begin{figure}[H]
+\centering
+\includegraphics[width=\textwidth]{ {{- graficos.outliers_por_mes -}} }
+\caption{Días atípicos por mes}
+\end{figure}
+{% endif %}
+{% endif %}
+
+{% if comparacion_empleados %}
+\clearpage
+
+\section{Comparación entre Períodos}
+
+\infobox{Variación de horas y días trabajados}{
+  Cada mes del informe se compara contra su período base (mismo mes del año anterior, salvo que se indique otro). Los días de departamento suman los días trabajados por cada empleado.
+}
+
+\subsection{Por departamento}
+
+\begin{table}[H]
+\centering
+\mejoradatabla{
+\begin{tabular}{>{\bfseries}lllrrrr}
+\toprule
+\rowcolor{grisclaro} \textbf{Mes} & \textbf{Base} & \textbf{Departamento} & \textbf{Hrs} & \textbf{$\Delta$ Hrs} & \textbf{Días} & \textbf{$\Delta$ Días}\\
+\midrule
+{% for row in comparacion_departamentos %}
+{{ row.Mes }} & {{ row.Mes_base }} & {{ row.Departamento }} & {{ "%.2f"|format(row.Horas) }} & {{ "%+.2f"|format(row.Delta_horas) }} & {{ row.Dias }} & {{ "%+d"|format(row.Delta_dias) }}\\
+{% endfor %}
+\bottomrule
+\end{tabular}
+}
+\caption{Comparación por departamento}
+\end{table}
+
+\subsection{Por empleado}
+
+\begin{longtable}{>{\bfseries}lllrrrr}
+\toprule
+\rowcolor{grisclaro} \textbf{Mes} & \textbf{Base} & \textbf{Empleado} & \textbf{Hrs} & \textbf{$\Delta$ Hrs} & \textbf{Días} & \textbf{$\Delta$ Días}\\
+\midrule
+\endhead
+{% for row in comparacion_empleados %}
+{{ row.Mes }} & {{ row.Mes_base }} & {{ row.Nombre }} & {{ "%.2f"|format(row.Horas) }} & {{ "%+.2f"|format(row.Delta_horas) }} & {{ row.Dias }} & {{ "%+d"|format(row.Delta_dias) }}\\
+{% endfor %}
+\bottomrule
+\caption{Comparación por empleado}
+\end{longtable}
+{% endif %}
+
+{% if resumen_cumplimiento %}
+\clearpage
+
+\section{Cumplimiento de Horario}
+
+\infobox{Comparación contra el rol de turnos}{
+  Entradas tardías (con {{ tolerancia_minutos }} minutos de tolerancia), salidas anticipadas y horas extra de cada empleado respecto a su turno asignado.
+}
+
+{% for nombre, meses in resumen_cumplimiento.items() %}
+\subsection{ {{ nombre }} }
+
+\begin{table}[H]
+\centering
+\mejoradatabla{
+\begin{tabular}{>{\bfseries}lrrrrrr}
+\toprule
+\rowcolor{grisclaro} \textbf{Mes} & \textbf{Tardanzas} & \textbf{Min tarde} & \textbf{Salidas ant.} & \textbf{Min ant.} & \textbf{Hrs extra} & \textbf{Sin turno}\\
+\midrule
+{% for row in meses %}
+{{ row.Mes }} & {{ row.Dias_tarde }} & {{ "%.0f"|format(row.Minutos_tarde) }} & {{ row.Salidas_anticipadas }} & {{ "%.0f"|format(row.Minutos_anticipados) }} & {{ "%.2f"|format(row.Horas_extra) }} & {{ row.Dias_sin_turno }}\\
+{% endfor %}
+\bottomrule
+\end{tabular}
+}
+\caption{Cumplimiento de horario de {{ nombre }}}
+\end{table}
+{% endfor %}
+{% endif %}
+
+
+{% if resumen_ausencias %}
+\clearpage
+
+\section{Ausencias y Cobertura}
+
+\infobox{Días esperados sin marcaje}{
+  Se consideran ausencias los días en que el empleado debía trabajar (según el rol de turnos o, en su defecto, los días hábiles entre su primer y último marcaje) y no registró ningún marcaje. La racha de trabajo es la mayor cantidad de días consecutivos con marcaje.
+}
+
+\subsection{Ausencias por empleado}
+
+\begin{longtable}{>{\bfseries}lrrrrl}
+\toprule
+\rowcolor{grisclaro} \textbf{Empleado} & \textbf{Esperados} & \textbf{Presentes} & \textbf{Ausencias} & \textbf{Racha} & \textbf{Desde}\\
+\midrule
+\endhead
+{% for row in resumen_ausencias %}
+{{ row.Nombre }} & {{ row.Dias_esperados }} & {{ row.Dias_presentes }} & {{ row.Ausencias }} & {{ row.Racha_trabajo }} & {{ row.Inicio_racha_trabajo.strftime('%Y-%m-%d') if row.Racha_trabajo else '' }}\\
+{% endfor %}
+\bottomrule
+\caption{Ausencias y rachas de trabajo por empleado}
+\end{longtable}
+
+{% if cobertura %}
+\subsection{Cobertura por departamento}
+
+\begin{longtable}{>{\bfseries}llrrrl}
+\toprule
+\rowcolor{grisclaro} \textbf{Departamento} & \textbf{Mes} & \textbf{Plantilla} & \textbf{Promedio} & \textbf{Mínimo} & \textbf{Fecha mínimo}\\
+\midrule
+\endhead
+{% for row in cobertura %}
+{{ row.Departamento }} & {{ row.Mes }} & {{ row.Plantilla }} & {{ "%.1f"|format(row.Promedio) }} & {{ row.Minimo }} & {{ row.Fecha_minimo.strftime('%Y-%m-%d') }}\\
+{% endfor %}
+\bottomrule
+\caption{Personal presente por día hábil}
+\end{longtable}
+{% endif %}
+{% endif %}
+
 
 \clearpage
 
@@ -261,20 +428,31 @@ LATEX_TEMPLATE = r"""
 \\
 {% endif %}
 
-{% set dias_fin_semana = [] %}
-{% for r in regs %}
-    {% if r['Fecha'].weekday() >= 5 %}
-        {% set dias_fin_semana = dias_fin_semana.append(r) or dias_fin_semana %}
-    {% endif %}
-{% endfor %}
+{% set dias_fin_semana = regs|rejectattr('Tipo_dia', 'equalto', 'Día de semana')|list %}
 {% if dias_fin_semana and dias_fin_semana|length > 0 %}
-\infobox{Fines de Semana Trabajados}{
-\begin{tabular}{lr}
+\infobox{Fines de Semana y Feriados Trabajados}{
+\begin{tabular}{llr}
 \toprule
-\rowcolor{grisclaro} \textbf{Fecha} & \textbf{Horas}\\
+\rowcolor{grisclaro} \textbf{Fecha} & \textbf{Tipo} & \textbf{Horas}\\
 \midrule
 {% for r in dias_fin_semana %}
-{{ r['Fecha'].strftime('%Y-%m-%d') }} & {{ "%.2f"|format(r['Jornada'].total_seconds() / 3600) }}\\
+{{ r['Fecha'].strftime('%Y-%m-%d') }} & {{ r['Tipo_dia'] }} & {{ "%.2f"|format(r['Jornada'].total_seconds() / 3600) }}\\
+{% endfor %}
+\bottomrule
+\end{tabular}
+}
+\\
+\\
+{% endif %}
+
+{% if nombre in ausencias_por_persona_y_mes and mes in ausencias_por_persona_y_mes[nombre] %}
+\infobox{D\'ias sin Marcaje}{
+\begin{tabular}{l}
+\toprule
+\rowcolor{grisclaro} \textbf{Fecha}\\
+\midrule
+{% for f in ausencias_por_persona_y_mes[nombre][mes] %}
+{{ f.strftime('%Y-%m-%d') }}\\
 {% endfor %}
 \bottomrule
 \end{tabular}
@@ -331,7 +509,21 @@ LATEX_TEMPLATE = r"""
 """
 
 
-def render_report(context: dict, output_path: str):
+def render_report(context: dict, output_path=None):
+    """
+    Renderiza la plantilla LaTeX. output_path puede ser una ruta (se escribe el archivo),
+    un objeto tipo archivo de texto o binario (se escribe en él) o None, en cuyo caso se
+    devuelve un io.BytesIO con el documento en UTF-8, posicionado al inicio.
+    """
     tex = Template(LATEX_TEMPLATE).render(**context)
+    if output_path is None:
+        return io.BytesIO(tex.encode('utf-8'))
+    if hasattr(output_path, 'write'):
+        if isinstance(output_path, io.TextIOBase):
+            output_path.write(tex)
+        else:
+            output_path.write(tex.encode('utf-8'))
+        return output_path
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(tex)
\ No newline at end of file
+        f.write(tex)
+    return output_path
\ No newline at end of file